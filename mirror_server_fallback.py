@@ -3,153 +3,442 @@
 Daylight Mirror — streams Mac display to Daylight DC-1 over USB.
 Instrumented with latency analytics on /stats endpoint.
 """
+import asyncio
+import ctypes
+import heapq
+import os
+import socket
 import subprocess
+import sys
 import threading
 import time
 import json
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from socketserver import ThreadingMixIn
-from collections import deque
+from urllib.parse import parse_qs
 
+try:
+    import Quartz  # pyobjc-framework-Quartz, bundled with /usr/bin/python3
+except ImportError:
+    Quartz = None
+try:
+    import AppKit  # pyobjc-framework-Cocoa, for the cursor image
+except ImportError:
+    AppKit = None
+
+# Swapped wholesale by capture() and read by handler threads without a lock:
+# it is always an immutable bytes object, and rebinding a module global is a
+# single atomic store under the GIL, so readers see either the old or the
+# new frame, never a torn one.
 latest_frame = b''
-lock = threading.Lock()
+# Set (on the event loop) each time capture() publishes a frame, then replaced
+# with a fresh Event so waiters only ever see frames newer than their wait.
+frame_event = None
+frame_loop = None
+frame_seq = 0  # bumped once per published frame; only capture() writes it
 DISPLAY_NUM = '1'
+# Lossy quality for in-process encoding (0..1). Frames are bandwidth-bound on
+# the USB/TCP hop, so smaller JPEGs translate directly into frame rate.
+JPEG_QUALITY = 0.6
 
 # Analytics
-capture_times = deque(maxlen=100)   # ms per screencapture call
-read_times = deque(maxlen=100)      # ms to read file
-frame_sizes = deque(maxlen=100)     # bytes
-serve_times = deque(maxlen=100)     # ms to serve a /frame request
+class Ring:
+    """Last `size` samples in a preallocated buffer with a running sum."""
+
+    def __init__(self, size=100):
+        self.buf = [0.0] * size
+        self.idx = 0
+        self.n = 0
+        self.total = 0.0
+
+    def push(self, x):
+        if self.n == len(self.buf):
+            self.total -= self.buf[self.idx]
+        else:
+            self.n += 1
+        self.buf[self.idx] = x
+        self.total += x
+        self.idx = (self.idx + 1) % len(self.buf)
+
+    def avg(self):
+        return self.total / self.n if self.n else 0
+
+    def p95(self):
+        # Same rank as sorted(window)[int(n * 0.95)], found by selecting the
+        # few largest samples instead of sorting the whole window.
+        if not self.n:
+            return 0
+        window = self.buf if self.n == len(self.buf) else self.buf[:self.n]
+        return heapq.nlargest(self.n - int(self.n * 0.95), window)[-1]
+
+
+capture_times = Ring()   # ms per capture
+frame_sizes = Ring()     # bytes
+serve_times = Ring()     # ms to serve a /frame request
 frame_count = 0
 capture_count = 0
 start_time = time.time()
 
+def grab_screencapture():
+    # '-' makes screencapture write the JPEG to stdout, so the frame
+    # never touches the filesystem.
+    proc = subprocess.run(
+        ['screencapture', '-C', '-x', '-D', DISPLAY_NUM, '-t', 'jpg', '-'],
+        timeout=2, capture_output=True
+    )
+    return proc.stdout
+
+
+def make_cursor_compositor(display_id):
+    """Return draw(image) -> image with the system cursor composited on top.
+
+    CGDisplayCreateImage leaves the cursor out, so it is drawn back in at
+    the current pointer location to match screencapture -C. The bitmap
+    context is reused while the frame size is unchanged.
+    """
+    bounds = Quartz.CGDisplayBounds(display_id)
+    space = Quartz.CGColorSpaceCreateDeviceRGB()
+    ctx = None
+    ctx_size = None
+
+    def draw(image):
+        nonlocal ctx, ctx_size
+        cursor = AppKit.NSCursor.currentSystemCursor()
+        if cursor is None:
+            return image
+        px, py = Quartz.CGEventGetLocation(Quartz.CGEventCreate(None))
+        px -= bounds.origin.x
+        py -= bounds.origin.y
+        if not (0 <= px < bounds.size.width and 0 <= py < bounds.size.height):
+            return image
+        width = Quartz.CGImageGetWidth(image)
+        height = Quartz.CGImageGetHeight(image)
+        if ctx_size != (width, height):
+            ctx = Quartz.CGBitmapContextCreate(
+                None, width, height, 8, 0, space,
+                Quartz.kCGImageAlphaPremultipliedFirst)
+            ctx_size = (width, height)
+        cursor_image = cursor.image()
+        cg_cursor, _ = cursor_image.CGImageForProposedRect_context_hints_(
+            None, None, None)
+        if ctx is None or cg_cursor is None:
+            return image
+        # Points -> pixels, and CoreGraphics' origin is bottom-left.
+        scale = width / bounds.size.width
+        hot = cursor.hotSpot()
+        size = cursor_image.size()
+        rect = Quartz.CGRectMake(
+            (px - hot.x) * scale,
+            height - (py - hot.y + size.height) * scale,
+            size.width * scale, size.height * scale)
+        full = Quartz.CGRectMake(0, 0, width, height)
+        Quartz.CGContextDrawImage(ctx, full, image)
+        Quartz.CGContextDrawImage(ctx, rect, cg_cursor)
+        return Quartz.CGBitmapContextCreateImage(ctx) or image
+
+    return draw
+
+
+def make_native_grabber():
+    """Grab + JPEG-encode in-process via CoreGraphics/ImageIO.
+
+    Resolves the display once and reuses it, so each frame skips the
+    fork/exec, CoreGraphics connection setup and encoder init that a
+    screencapture child pays. The cursor is composited in as with
+    screencapture -C. Returns None if Quartz or AppKit is unavailable,
+    leaving screencapture as the grabber.
+    """
+    if Quartz is None or AppKit is None:
+        return None
+    err, displays, count = Quartz.CGGetActiveDisplayList(16, None, None)
+    index = int(DISPLAY_NUM) - 1  # screencapture -D is 1-based
+    if err or index >= count:
+        return None
+    display_id = displays[index]
+    with_cursor = make_cursor_compositor(display_id)
+    # One encoder output buffer for the life of the grabber: truncating it
+    # keeps its capacity, so steady-state frames don't reallocate. Each frame
+    # is then snapshotted into immutable bytes, which is what latest_frame
+    # readers and in-flight socket writes hold on to.
+    out = Quartz.CFDataCreateMutable(None, 0)
+    options = {Quartz.kCGImageDestinationLossyCompressionQuality: JPEG_QUALITY}
+
+    def grab():
+        image = Quartz.CGDisplayCreateImage(display_id)
+        if image is None:
+            return b''
+        image = with_cursor(image)
+        Quartz.CFDataSetLength(out, 0)
+        dest = Quartz.CGImageDestinationCreateWithData(out, 'public.jpeg', 1, None)
+        Quartz.CGImageDestinationAddImage(dest, image, options)
+        if not Quartz.CGImageDestinationFinalize(dest):
+            return b''
+        return bytes(out)
+
+    return grab
+
+
+QOS_CLASS_USER_INTERACTIVE = 0x21
+
+
+def prioritize_capture_thread():
+    """Keep the capture loop from being preempted by request handling.
+
+    macOS: promote the calling thread to the USER_INTERACTIVE QoS class.
+    Linux: pin the calling thread to the first allowed CPU; serve() keeps the
+    event loop on the others. Best effort — failures are ignored.
+    """
+    try:
+        if sys.platform == 'darwin':
+            libsystem = ctypes.CDLL('/usr/lib/libSystem.B.dylib')
+            libsystem.pthread_set_qos_class_self_np(QOS_CLASS_USER_INTERACTIVE, 0)
+        elif hasattr(os, 'sched_setaffinity'):
+            cpus = sorted(os.sched_getaffinity(0))
+            if len(cpus) > 1:
+                os.sched_setaffinity(0, cpus[:1])
+    except (OSError, AttributeError):
+        pass
+
+
 def capture():
-    global latest_frame, capture_count
-    path = '/tmp/_mirror_frame.jpg'
+    global latest_frame, capture_count, frame_seq
+    prioritize_capture_thread()
+    grab = make_native_grabber() or grab_screencapture
     while True:
         t0 = time.monotonic()
         try:
-            subprocess.run(
-                ['screencapture', '-C', '-x', '-D', DISPLAY_NUM, '-t', 'jpg', path],
-                timeout=2, capture_output=True
-            )
-            t1 = time.monotonic()
-            capture_ms = (t1 - t0) * 1000
-
-            with open(path, 'rb') as f:
-                data = f.read()
-            t2 = time.monotonic()
-            read_ms = (t2 - t1) * 1000
+            data = grab()
+            capture_ms = (time.monotonic() - t0) * 1000
 
             if data:
-                with lock:
-                    latest_frame = data
-                capture_times.append(capture_ms)
-                read_times.append(read_ms)
-                frame_sizes.append(len(data))
+                latest_frame = data
+                frame_seq += 1
+                if frame_loop is not None:
+                    frame_loop.call_soon_threadsafe(notify_frame)
+                capture_times.push(capture_ms)
+                frame_sizes.push(len(data))
                 capture_count += 1
         except Exception:
             pass
         # No sleep — capture as fast as possible
 
 
-class ThreadedHTTP(ThreadingMixIn, HTTPServer):
-    daemon_threads = True
-
-
-class Handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        global frame_count
-        if self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/html')
-            self.end_headers()
-            self.wfile.write(b'''<!DOCTYPE html><html>
+INDEX_HTML = b'''<!DOCTYPE html><html>
 <head><meta name="viewport" content="width=device-width,initial-scale=1,user-scalable=no">
 <style>*{margin:0;padding:0;overflow:hidden}
 body{background:#000;width:100vw;height:100vh;touch-action:none}
 img{width:100vw;height:100vh;object-fit:fill;display:block}</style></head>
-<body><img id="v"><script>
-const img=document.getElementById('v');
-let prev='';
-async function run(){
-  while(true){
-    try{
-      const r=await fetch('/frame',{cache:'no-store'});
-      const b=await r.blob();
-      const u=URL.createObjectURL(b);
-      img.src=u;
-      if(prev)URL.revokeObjectURL(prev);
-      prev=u;
-    }catch(e){}
-    await new Promise(r=>setTimeout(r,50));
-  }
-}
-run();
+<body><img id="v" src="/stream"><script>
 document.body.addEventListener('click',()=>{
   document.documentElement.requestFullscreen().catch(()=>{});
 });
-</script></body></html>''')
-        elif self.path == '/frame':
-            t0 = time.monotonic()
-            with lock:
-                f = latest_frame
-            if f:
-                self.send_response(200)
-                self.send_header('Content-Type', 'image/jpeg')
-                self.send_header('Content-Length', str(len(f)))
-                self.send_header('Cache-Control', 'no-store')
-                self.end_headers()
-                self.wfile.write(f)
-                serve_times.append((time.monotonic() - t0) * 1000)
-                frame_count += 1
-            else:
-                self.send_response(503)
-                self.end_headers()
-        elif self.path == '/stats':
-            uptime = time.time() - start_time
-            def avg(d): return sum(d) / len(d) if d else 0
-            def p95(d):
-                if not d: return 0
-                s = sorted(d)
-                return s[int(len(s) * 0.95)]
-            stats = {
-                'uptime_s': round(uptime, 1),
-                'capture': {
-                    'count': capture_count,
-                    'fps': round(capture_count / uptime, 1) if uptime > 0 else 0,
-                    'avg_ms': round(avg(capture_times), 1),
-                    'p95_ms': round(p95(capture_times), 1),
-                },
-                'read': {
-                    'avg_ms': round(avg(read_times), 1),
-                },
-                'frame_size': {
-                    'avg_kb': round(avg(frame_sizes) / 1024, 1),
-                },
-                'serve': {
-                    'count': frame_count,
-                    'fps': round(frame_count / uptime, 1) if uptime > 0 else 0,
-                    'avg_ms': round(avg(serve_times), 1),
-                    'p95_ms': round(p95(serve_times), 1),
-                },
-                'pipeline_total_avg_ms': round(avg(capture_times) + avg(read_times), 1),
-            }
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(stats, indent=2).encode())
+</script></body></html>'''
+INDEX_RESPONSE = (
+    b'HTTP/1.1 200 OK\r\n'
+    b'Content-Type: text/html\r\n'
+    b'Content-Length: %d\r\n\r\n' % len(INDEX_HTML)
+) + INDEX_HTML
+
+REASONS = {200: 'OK', 404: 'Not Found', 501: 'Not Implemented', 503: 'Service Unavailable'}
+
+
+def respond(writer, status, headers=(), body=b''):
+    """Write a complete HTTP/1.1 response; the connection stays open."""
+    head = [f'HTTP/1.1 {status} {REASONS[status]}']
+    head.extend(f'{k}: {v}' for k, v in headers)
+    head.append(f'Content-Length: {len(body)}')
+    # Headers and body go out as one gather write (sendmsg on Python 3.12+),
+    # so the JPEG is neither concatenated onto the headers nor sent as a
+    # separate segment.
+    writer.writelines([('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'), body])
+
+
+def notify_frame():
+    global frame_event
+    frame_event.set()
+    frame_event = asyncio.Event()
+
+
+async def serve_index(writer, query):
+    writer.write(INDEX_RESPONSE)
+
+
+async def serve_frame(writer, query):
+    """Latest frame. With ?since=N, long-poll (up to 1s) for a frame newer
+    than N instead of re-sending one the client already has."""
+    global frame_count
+    try:
+        since = int(query['since'][0])
+    except (KeyError, ValueError):
+        since = None
+    if since is not None:
+        deadline = time.monotonic() + 1.0
+        while frame_seq <= since:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(frame_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+    t0 = time.monotonic()
+    seq = frame_seq
+    f = latest_frame
+    if f:
+        respond(writer, 200, [
+            ('Content-Type', 'image/jpeg'),
+            ('Cache-Control', 'no-store'),
+            ('X-Frame-Seq', seq),
+        ], f)
+        # respond() only buffers into the transport; time the send itself,
+        # as serve_stream does.
+        await writer.drain()
+        serve_times.push((time.monotonic() - t0) * 1000)
+        frame_count += 1
+    else:
+        respond(writer, 503)
+
+
+def build_stats():
+    uptime = time.time() - start_time
+    return {
+        'uptime_s': round(uptime, 1),
+        'capture': {
+            'count': capture_count,
+            'fps': round(capture_count / uptime, 1) if uptime > 0 else 0,
+            'avg_ms': round(capture_times.avg(), 1),
+            'p95_ms': round(capture_times.p95(), 1),
+        },
+        'frame_size': {
+            'avg_kb': round(frame_sizes.avg() / 1024, 1),
+        },
+        'serve': {
+            'count': frame_count,
+            'fps': round(frame_count / uptime, 1) if uptime > 0 else 0,
+            'avg_ms': round(serve_times.avg(), 1),
+            'p95_ms': round(serve_times.p95(), 1),
+        },
+        'pipeline_total_avg_ms': round(capture_times.avg(), 1),
+    }
+
+
+# Stats are approximate anyway; pollers hitting /stats faster than this get the
+# previously serialized body instead of a fresh computation.
+STATS_TTL_S = 0.2
+_stats_cache = {'t': 0.0, 'stats': None, 'compact': None, 'pretty': None}
+
+
+async def serve_stats(writer, query):
+    """Compact JSON; ?pretty=1 for an indented copy meant for humans."""
+    now = time.monotonic()
+    if now - _stats_cache['t'] > STATS_TTL_S:
+        _stats_cache.update(t=now, stats=build_stats(), compact=None, pretty=None)
+    pretty = query.get('pretty', ['0'])[0] not in ('', '0')
+    key = 'pretty' if pretty else 'compact'
+    body = _stats_cache[key]
+    if body is None:
+        if pretty:
+            body = json.dumps(_stats_cache['stats'], indent=2).encode()
         else:
-            self.send_response(404)
-            self.end_headers()
+            body = json.dumps(_stats_cache['stats'], separators=(',', ':')).encode()
+        _stats_cache[key] = body
+    respond(writer, 200, [('Content-Type', 'application/json')], body)
+
+
+async def serve_stream(writer, query):
+    """MJPEG: one long-lived response, one multipart part per captured frame."""
+    global frame_count
+    writer.write(
+        b'HTTP/1.1 200 OK\r\n'
+        b'Content-Type: multipart/x-mixed-replace; boundary=frame\r\n'
+        b'Cache-Control: no-store\r\n\r\n'
+    )
+    while True:
+        await frame_event.wait()
+        t0 = time.monotonic()
+        f = latest_frame
+        writer.writelines([
+            b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n' % len(f),
+            f,
+            b'\r\n',
+        ])
+        await writer.drain()
+        serve_times.push((time.monotonic() - t0) * 1000)
+        frame_count += 1
+
 
-    def log_message(self, *args):
+ROUTES = {
+    '/': serve_index,
+    '/frame': serve_frame,
+    '/stream': serve_stream,
+    '/stats': serve_stats,
+}
+
+
+async def handle(reader, writer):
+    """Serve GET requests on one keep-alive connection.
+
+    Every connection runs as a coroutine on the single event-loop thread, so
+    there is no per-request thread spawn and no GIL handoff between handlers.
+    """
+    # Frames are one write each; don't let Nagle hold the tail segment back
+    # waiting for an ACK.
+    sock = writer.get_extra_info('socket')
+    if sock is not None:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            parts = request_line.split()
+            keep_alive = parts[2:3] != [b'HTTP/1.0']
+            while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                # Connection is the only header that matters here.
+                name, _, value = line.partition(b':')
+                if name.strip().lower() == b'connection':
+                    value = value.strip().lower()
+                    if value == b'close':
+                        keep_alive = False
+                    elif value == b'keep-alive':
+                        keep_alive = True
+            if parts[:1] != [b'GET']:
+                respond(writer, 501)
+            else:
+                target = parts[1].decode('latin-1') if len(parts) > 1 else '/'
+                path, _, query = target.partition('?')
+                route = ROUTES.get(path)
+                if route:
+                    await route(writer, parse_qs(query))
+                else:
+                    respond(writer, 404)
+            await writer.drain()
+            if not keep_alive:
+                break
+    # ValueError: a request or header line longer than the reader's limit.
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
         pass
+    finally:
+        writer.close()
+
+
+async def serve(host, port):
+    global frame_event, frame_loop
+    frame_event = asyncio.Event()
+    frame_loop = asyncio.get_running_loop()
+    if sys.platform != 'darwin' and hasattr(os, 'sched_setaffinity'):
+        # Leave the first CPU to the capture thread (see prioritize_capture_thread).
+        cpus = sorted(os.sched_getaffinity(0))
+        if len(cpus) > 1:
+            try:
+                os.sched_setaffinity(0, cpus[1:])
+            except OSError:
+                pass
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
 
 
 if __name__ == '__main__':
     t = threading.Thread(target=capture, daemon=True)
     t.start()
     print("Daylight Mirror — instrumented, /stats for analytics", flush=True)
-    ThreadedHTTP(('127.0.0.1', 8888), Handler).serve_forever()
+    asyncio.run(serve('127.0.0.1', 8888))
@@ -14,71 +14,84 @@ from __future__ import annotations
 
 import argparse
 import json
+import mmap
 import sys
 from collections import Counter
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
 
 def load_ledger(path: Path) -> list[dict[str, Any]]:
-    if not path.exists():
+    if not path.exists() or path.stat().st_size == 0:
         return []
     entries: list[dict[str, Any]] = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            entries.append(json.loads(line))
-        except json.JSONDecodeError:
-            continue
+    # Parse straight out of a read-only mapping: no decoded copy of the whole
+    # file and no intermediate list of lines.
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        size = len(mm)
+        while start < size:
+            end = mm.find(b"\n", start)
+            if end < 0:
+                end = size
+            line = mm[start:end].strip()
+            start = end + 1
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
     return entries
 
 
-def latest_per_id(entries: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
-    latest: dict[str, dict[str, Any]] = {}
-    for entry in entries:
-        eid = entry.get("id", "")
-        latest[eid] = entry
-    return latest
-
-
 def rank_by_metric(
     experiments: dict[str, dict[str, Any]],
     metric_key: str,
     lower_is_better: bool = True,
 ) -> list[tuple[str, float | None]]:
-    scored: list[tuple[str, float | None]] = []
+    scored: list[tuple[str, float]] = []
+    missing: list[tuple[str, None]] = []
     for eid, exp in experiments.items():
         avg = exp.get("metrics", {}).get("averages", {}).get(metric_key)
-        scored.append((eid, avg))
+        if avg is None:
+            missing.append((eid, None))
+        else:
+            scored.append((eid, avg))
 
-    scored.sort(key=lambda x: (x[1] is None, x[1] if lower_is_better else -(x[1] or 0)))
-    return scored
+    # Experiments without the metric always rank last.
+    scored.sort(key=itemgetter(1), reverse=not lower_is_better)
+    return scored + missing
 
 
-def failure_patterns(entries: list[dict[str, Any]]) -> dict[str, Any]:
+def fold_ledger(entries: list[dict[str, Any]]) -> tuple[dict[str, dict[str, Any]], dict[str, Any]]:
+    """Single pass over the ledger: latest entry per id plus failure patterns."""
+    latest: dict[str, dict[str, Any]] = {}
     status_counts: Counter[str] = Counter()
     reason_counts: Counter[str] = Counter()
     blocked_commands: list[str] = []
 
     for entry in entries:
-        status_counts[entry.get("status", "unknown")] += 1
+        latest[entry.get("id", "")] = entry
+        status = entry.get("status", "unknown")
+        status_counts[status] += 1
         for reason in entry.get("reasons", []):
             reason_counts[reason] += 1
-        if entry.get("status") == "blocked":
+        if status == "blocked":
             for cr in entry.get("command_results", []):
                 if cr.get("returncode", 0) != 0:
                     blocked_commands.append(" ".join(cr.get("argv", [])))
 
-    return {
+    patterns = {
         "status_distribution": dict(status_counts),
         "top_failure_reasons": dict(reason_counts.most_common(10)),
         "blocked_commands": blocked_commands[:10],
     }
+    return latest, patterns
 
 
-def suggest_next(experiments: dict[str, dict[str, Any]], all_entries: list[dict[str, Any]]) -> list[dict[str, str]]:
+def suggest_next(experiments: dict[str, dict[str, Any]], patterns: dict[str, Any]) -> list[dict[str, str]]:
     suggestions: list[dict[str, str]] = []
     tried_ids = set(experiments.keys())
 
@@ -119,7 +132,7 @@ def suggest_next(experiments: dict[str, dict[str, Any]], all_entries: list[dict[
             "rationale": "Adaptive backpressure (RTT-aware threshold) not yet tested. Low risk, moderate expected gain.",
         })
 
-    blocked_count = sum(1 for e in all_entries if e.get("status") == "blocked")
+    blocked_count = patterns["status_distribution"].get("blocked", 0)
     if blocked_count > 3:
         suggestions.append({
             "id": "fix-build-stability",
@@ -141,12 +154,11 @@ def print_report(ledger_path: Path, as_json: bool) -> int:
         print(f"No entries in {ledger_path}", file=sys.stderr)
         return 1
 
-    experiments = latest_per_id(all_entries)
+    experiments, patterns = fold_ledger(all_entries)
     rtt_ranking = rank_by_metric(experiments, "rtt_avg_ms", lower_is_better=True)
     fps_ranking = rank_by_metric(experiments, "fps", lower_is_better=False)
     jitter_ranking = rank_by_metric(experiments, "jitter_ms", lower_is_better=True)
-    patterns = failure_patterns(all_entries)
-    next_steps = suggest_next(experiments, all_entries)
+    next_steps = suggest_next(experiments, patterns)
 
     report = {
         "total_entries": len(all_entries),
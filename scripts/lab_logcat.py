@@ -2,7 +2,10 @@
 """Capture Android-side latency metrics from adb logcat.
 
 Parses DaylightMirror log lines and writes structured samples to a JSON file
-that the overseer can merge with Mac-side status metrics.
+that the overseer can merge with Mac-side status metrics. While capturing,
+each sample is appended to a sibling .jsonl file; the JSON document is
+written once when capture ends, including on Ctrl+C, SIGTERM or an error.
+Only an uncatchable kill leaves the .jsonl as the sole record.
 
 Usage:
     python3 scripts/lab_logcat.py --output /tmp/daylight-mirror-android.json --duration 30
@@ -13,7 +16,7 @@ from __future__ import annotations
 
 import argparse
 import json
-import re
+import signal
 import subprocess
 import sys
 import time
@@ -22,40 +25,45 @@ from pathlib import Path
 from typing import Any
 
 
-# Match the LOGI line from mirror_native.c:
-# FPS: 28.5 | recv: 20.0ms | lz4: 3.0ms | delta: 4.6ms | neon: 5.6ms | vsync: 0.7ms | 294KB delta | drops: 1 | overwritten: 0 | total: 827
-STATS_RE = re.compile(
-    r"FPS:\s*(?P<fps>[\d.]+)\s*\|"
-    r"\s*recv:\s*(?P<recv_ms>[\d.]+)ms\s*\|"
-    r"\s*lz4:\s*(?P<lz4_ms>[\d.]+)ms\s*\|"
-    r"\s*delta:\s*(?P<delta_ms>[\d.]+)ms\s*\|"
-    r"\s*neon:\s*(?P<neon_ms>[\d.]+)ms\s*\|"
-    r"\s*vsync:\s*(?P<vsync_ms>[\d.]+)ms\s*\|"
-    r"\s*(?P<frame_kb>\d+)KB\s+(?P<frame_type>\w+)\s*\|"
-    r"\s*drops:\s*(?P<drops>\d+)\s*\|"
-    r"\s*overwritten:\s*(?P<overwritten>\d+)\s*\|"
-    r"\s*total:\s*(?P<total>\d+)"
-)
+# Parse the LOGI line from mirror_native.c:
+# FPS: 28.5 | recv: 20.0ms | lz4: 3.0ms | delta: 4.6ms | neon: 5.6ms | vsync: 0.7ms | 294KB delta | drops: 1 | skip: 0 | overwritten: 0 | total: 827
+# Fields are "label: value" separated by "|", except the unlabeled "<n>KB <type>"
+# frame field. Unknown labels (e.g. skip) are ignored.
+MS_FIELDS = ("recv", "lz4", "delta", "neon", "vsync")
+INT_FIELDS = ("drops", "overwritten", "total")
 
 
 def parse_stats_line(line: str) -> dict[str, Any] | None:
-    m = STATS_RE.search(line)
-    if not m:
+    pos = line.find("FPS:")
+    if pos < 0:
         return None
-    return {
-        "ts": datetime.now(timezone.utc).isoformat(),
-        "fps": float(m.group("fps")),
-        "recv_ms": float(m.group("recv_ms")),
-        "lz4_ms": float(m.group("lz4_ms")),
-        "delta_ms": float(m.group("delta_ms")),
-        "neon_ms": float(m.group("neon_ms")),
-        "vsync_ms": float(m.group("vsync_ms")),
-        "frame_kb": int(m.group("frame_kb")),
-        "frame_type": m.group("frame_type"),
-        "drops": int(m.group("drops")),
-        "overwritten": int(m.group("overwritten")),
-        "total": int(m.group("total")),
-    }
+    fields: dict[str, str] = {}
+    frame: list[str] = []
+    for part in line[pos:].split("|"):
+        label, sep, value = part.partition(":")
+        if sep:
+            fields[label.strip()] = value.strip()
+        else:
+            frame = part.split()
+    try:
+        sample: dict[str, Any] = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "fps": float(fields["FPS"]),
+        }
+        for name in MS_FIELDS:
+            sample[f"{name}_ms"] = float(fields[name].removesuffix("ms"))
+        kb, frame_type = frame
+        sample["frame_kb"] = int(kb.removesuffix("KB"))
+        sample["frame_type"] = frame_type
+        for name in INT_FIELDS:
+            sample[name] = int(fields[name])
+    except (KeyError, ValueError):
+        return None
+    return sample
+
+
+def _interrupt(signum: int, frame: Any) -> None:
+    raise KeyboardInterrupt
 
 
 def run_logcat(output_path: Path, duration_s: float | None, follow: bool) -> int:
@@ -68,40 +76,43 @@ def run_logcat(output_path: Path, duration_s: float | None, follow: bool) -> int
         ["adb", "logcat", "-s", "DaylightMirror:I"],
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True,
-        bufsize=1,
     )
 
+    live_path = output_path.with_suffix(".jsonl")
+    live = live_path.open("wb")
+    # Treat SIGTERM like Ctrl+C so the finally block still writes the document.
+    previous_sigterm = signal.signal(signal.SIGTERM, _interrupt)
+
     try:
         assert proc.stdout is not None
-        for line in proc.stdout:
-            line = line.strip()
-            sample = parse_stats_line(line)
+        for raw in proc.stdout:
+            # Nearly every logcat line is not a stats line; reject those with
+            # a bytes substring check before paying for decode + parse.
+            sample = parse_stats_line(raw.decode("utf-8", "replace").strip()) if b"FPS:" in raw else None
             if sample:
                 samples.append(sample)
+                encoded = json.dumps(sample)
                 if follow:
-                    print(json.dumps(sample))
-
-                output_path.write_text(
-                    json.dumps({"samples": samples, "count": len(samples)}, indent=2) + "\n",
-                    encoding="utf-8",
-                )
+                    print(encoded)
+                live.write(encoded.encode("utf-8") + b"\n")
+                live.flush()
 
             if deadline and time.time() >= deadline:
                 break
     except KeyboardInterrupt:
         pass
     finally:
+        signal.signal(signal.SIGTERM, previous_sigterm)
+        live.close()
         proc.terminate()
         try:
             proc.wait(timeout=5)
         except subprocess.TimeoutExpired:
             proc.kill()
-
-    output_path.write_text(
-        json.dumps({"samples": samples, "count": len(samples)}, indent=2) + "\n",
-        encoding="utf-8",
-    )
+        output_path.write_text(
+            json.dumps({"samples": samples, "count": len(samples)}, indent=2) + "\n",
+            encoding="utf-8",
+        )
     print(f"Captured {len(samples)} Android metric samples → {output_path}")
     return 0
 
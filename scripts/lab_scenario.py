@@ -23,11 +23,19 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import collections
+import contextlib
+import ctypes
+import functools
 import math
+import queue
+import string
 import subprocess
 import sys
+import threading
 import time
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Iterator, Mapping
 
 try:
     import Quartz  # type: ignore[import-untyped]
@@ -35,13 +43,24 @@ try:
         CGEventCreateMouseEvent,
         CGEventCreateScrollWheelEvent,
         CGEventCreateKeyboardEvent,
+        CGEventKeyboardSetUnicodeString,
         CGEventPost,
+        CGEventPostToPid,
         CGEventSetIntegerValueField,
+        CGEventSetLocation,
+        CGEventSourceCreate,
+        CGPointMake,
+        CGDisplayRegisterReconfigurationCallback,
+        kCGDisplayAddFlag,
+        kCGDisplayBeginConfigurationFlag,
+        kCGDisplayRemoveFlag,
+        kCGDisplaySetModeFlag,
         kCGEventMouseMoved,
         kCGEventLeftMouseDown,
         kCGEventLeftMouseUp,
         kCGEventLeftMouseDragged,
         kCGEventScrollWheel,
+        kCGEventSourceStateHIDSystemState,
         kCGHIDEventTap,
         kCGScrollEventUnitPixel,
     )
@@ -51,6 +70,33 @@ except ImportError:
     print("Or use system Python which includes it: /usr/bin/python3", file=sys.stderr)
     sys.exit(1)
 
+try:
+    from AppKit import NSRunningApplication  # type: ignore[import-untyped]
+    from Foundation import (  # type: ignore[import-untyped]
+        NSDate,
+        NSDistributedNotificationCenter,
+        NSRunLoop,
+        NSUserDefaults,
+    )
+except ImportError:
+    NSRunningApplication = None
+    NSDistributedNotificationCenter = None
+    NSUserDefaults = None
+
+# Every synthesized event is created against one shared HID-state source
+# instead of each CGEventCreate* call setting up default source state.
+EVENT_SOURCE = CGEventSourceCreate(kCGEventSourceStateHIDSystemState)
+
+TEXTEDIT_BUNDLE_ID = "com.apple.TextEdit"
+
+
+def running_pid(bundle_id: str) -> int | None:
+    """PID of a running app by bundle id (None if not running or no AppKit)."""
+    if NSRunningApplication is None:
+        return None
+    apps = NSRunningApplication.runningApplicationsWithBundleIdentifier_(bundle_id)
+    return int(apps[0].processIdentifier()) if apps else None
+
 
 def get_main_display_size() -> tuple[int, int]:
     """Get the main display resolution."""
@@ -60,117 +106,365 @@ def get_main_display_size() -> tuple[int, int]:
     return int(w), int(h)
 
 
+DRAG_MARGIN = 100
+SCROLL_STEP_PX = 3  # pixels per scroll event
+SCROLL_FLIP_S = 2  # seconds between scroll direction flips
+
+# Display geometry is read once and refreshed only when the display
+# configuration changes, rather than on every scenario entry.
+DISPLAY_SIZE: tuple[int, int] = (0, 0)
+DISPLAY_CENTER: tuple[float, float] = (0.0, 0.0)
+DRAG_RECT: tuple[tuple[float, float], ...] = ()
+
+
+def _refresh_display_geometry() -> None:
+    global DISPLAY_SIZE, DISPLAY_CENTER, DRAG_RECT
+    w, h = DISPLAY_SIZE = get_main_display_size()
+    DISPLAY_CENTER = (w / 2, h / 2)
+    DRAG_RECT = (
+        (DRAG_MARGIN, DRAG_MARGIN),
+        (w - DRAG_MARGIN, DRAG_MARGIN),
+        (w - DRAG_MARGIN, h - DRAG_MARGIN),
+        (DRAG_MARGIN, h - DRAG_MARGIN),
+    )
+
+
+def _display_reconfigured(display: int, flags: int, user_info: Any) -> None:
+    if flags & kCGDisplayBeginConfigurationFlag:
+        return
+    if flags & (kCGDisplaySetModeFlag | kCGDisplayAddFlag | kCGDisplayRemoveFlag):
+        _refresh_display_geometry()
+
+
+_refresh_display_geometry()
+CGDisplayRegisterReconfigurationCallback(_display_reconfigured, None)
+
+
 def move_mouse(x: float, y: float) -> None:
     """Move cursor to absolute position."""
-    point = Quartz.CGPointMake(x, y)
-    event = CGEventCreateMouseEvent(None, kCGEventMouseMoved, point, 0)
+    point = CGPointMake(x, y)
+    event = CGEventCreateMouseEvent(EVENT_SOURCE, kCGEventMouseMoved, point, 0)
     CGEventPost(kCGHIDEventTap, event)
 
 
 def mouse_down(x: float, y: float) -> None:
     """Press left mouse button at position."""
-    point = Quartz.CGPointMake(x, y)
-    event = CGEventCreateMouseEvent(None, kCGEventLeftMouseDown, point, 0)
+    point = CGPointMake(x, y)
+    event = CGEventCreateMouseEvent(EVENT_SOURCE, kCGEventLeftMouseDown, point, 0)
     CGEventPost(kCGHIDEventTap, event)
 
 
 def mouse_up(x: float, y: float) -> None:
     """Release left mouse button at position."""
-    point = Quartz.CGPointMake(x, y)
-    event = CGEventCreateMouseEvent(None, kCGEventLeftMouseUp, point, 0)
+    point = CGPointMake(x, y)
+    event = CGEventCreateMouseEvent(EVENT_SOURCE, kCGEventLeftMouseUp, point, 0)
     CGEventPost(kCGHIDEventTap, event)
 
 
 def mouse_drag(x: float, y: float) -> None:
     """Drag (mouse move while button held) to position."""
-    point = Quartz.CGPointMake(x, y)
-    event = CGEventCreateMouseEvent(None, kCGEventLeftMouseDragged, point, 0)
+    point = CGPointMake(x, y)
+    event = CGEventCreateMouseEvent(EVENT_SOURCE, kCGEventLeftMouseDragged, point, 0)
     CGEventPost(kCGHIDEventTap, event)
 
 
 def scroll(dx: int, dy: int) -> None:
     """Send scroll wheel event."""
-    event = CGEventCreateScrollWheelEvent(None, kCGScrollEventUnitPixel, 2, dy, dx)
+    event = CGEventCreateScrollWheelEvent(EVENT_SOURCE, kCGScrollEventUnitPixel, 2, dy, dx)
     CGEventPost(kCGHIDEventTap, event)
 
 
-def key_tap(keycode: int) -> None:
-    """Press and release a key."""
-    down = CGEventCreateKeyboardEvent(None, keycode, True)
-    up = CGEventCreateKeyboardEvent(None, keycode, False)
-    CGEventPost(kCGHIDEventTap, down)
-    time.sleep(0.02)
-    CGEventPost(kCGHIDEventTap, up)
+QOS_CLASS_USER_INTERACTIVE = 0x21
+QOS_CLASS_DEFAULT = 0x15
+THREAD_STANDARD_POLICY = 1
+THREAD_TIME_CONSTRAINT_POLICY = 2
+THREAD_TIME_CONSTRAINT_POLICY_COUNT = 4
+
+
+class _TimeConstraintPolicy(ctypes.Structure):
+    _fields_ = [
+        ("period", ctypes.c_uint32),
+        ("computation", ctypes.c_uint32),
+        ("constraint", ctypes.c_uint32),
+        ("preemptible", ctypes.c_int),
+    ]
+
+
+class _TimebaseInfo(ctypes.Structure):
+    _fields_ = [("numer", ctypes.c_uint32), ("denom", ctypes.c_uint32)]
+
+
+def set_thread_qos(qos_class: int) -> Any:
+    """Move the calling thread to `qos_class`; return libSystem, or None off macOS."""
+    try:
+        libc = ctypes.CDLL("/usr/lib/libSystem.B.dylib")
+    except OSError:
+        return None
+    libc.pthread_set_qos_class_self_np(qos_class, 0)
+    return libc
+
+
+@contextlib.contextmanager
+def realtime_qos(rate_hz: float | None = None) -> Iterator[None]:
+    """Run the block with the calling thread at USER_INTERACTIVE QoS.
+
+    With `rate_hz`, also request a Mach time-constraint (real-time) policy
+    whose period matches the scenario's pacing rate. This doesn't make sleeps
+    shorter; it makes the scheduler wake the thread closer to its deadline.
+    Best effort: anything the kernel refuses is left at the default policy.
+    """
+    libc = set_thread_qos(QOS_CLASS_USER_INTERACTIVE)
+    if libc is None:
+        yield
+        return
+
+    thread = None
+    if rate_hz:
+        libc.mach_thread_self.restype = ctypes.c_uint32
+        thread = libc.mach_thread_self()
+        timebase = _TimebaseInfo()
+        libc.mach_timebase_info(ctypes.byref(timebase))
+        period = int(1e9 / rate_hz * timebase.denom / timebase.numer)  # ns -> mach ticks
+        policy = _TimeConstraintPolicy(period, period // 4, period, 1)
+        libc.thread_policy_set(
+            thread, THREAD_TIME_CONSTRAINT_POLICY, ctypes.byref(policy), THREAD_TIME_CONSTRAINT_POLICY_COUNT
+        )
+
+    try:
+        yield
+    finally:
+        if thread is not None:
+            libc.thread_policy_set(thread, THREAD_STANDARD_POLICY, None, 0)
+            task = ctypes.c_uint32.in_dll(libc, "mach_task_self_")
+            libc.mach_port_deallocate(task, thread)
+        libc.pthread_set_qos_class_self_np(QOS_CLASS_DEFAULT, 0)
+
+
+class PrecisionSleeper:
+    """Deadline sleeps whose busy-wait tail tracks the host's wake-up lateness.
+
+    time.sleep on macOS routinely wakes hundreds of µs to a few ms late, by an
+    amount that varies per machine and load. Each call sleeps coarsely until
+    `spin` before the deadline, measures how late that wake-up actually was,
+    and folds it into `spin`: a later-than-expected wake raises it at once
+    (capped at half the wait, so one stall can't turn every later wait into a
+    pure busy-wait), otherwise it decays slowly towards the observed lateness.
+    The remainder is spun on perf_counter, landing on the deadline within
+    microseconds.
+    """
+
+    MIN_SPIN = 0.0002
+
+    def __init__(self, spin: float = 0.0015) -> None:
+        self.spin = spin
+
+    def sleep(self, dt: float) -> None:
+        """Sleep for `dt` seconds."""
+        target = time.perf_counter() + dt
+        coarse = dt - self.spin
+        if coarse > 0:
+            time.sleep(coarse)
+            late = time.perf_counter() - (target - self.spin)
+            if late > self.spin:
+                self.spin = min(late, dt / 2)
+            else:
+                self.spin = max(self.MIN_SPIN, 0.9 * self.spin + 0.1 * max(0.0, late))
+        else:
+            # Nothing was slept, so there is no lateness to measure; keep
+            # decaying so an oversized estimate recovers.
+            self.spin = max(self.MIN_SPIN, 0.9 * self.spin)
+        while time.perf_counter() < target:
+            pass
+
+    def wait_for_tick(self, start: float, tick: int, period: float) -> int:
+        """Sleep until the absolute deadline of `tick` on a `period` grid from `start`.
+
+        Deadlines are anchored to the schedule rather than to the previous
+        iteration, so oversleeping one tick shortens the next sleep instead of
+        accumulating drift. If `tick` is already past, skip ahead to the next
+        future tick rather than bursting to catch up. Returns the tick waited for.
+        """
+        now = time.perf_counter()
+        if start + tick * period < now:
+            tick = int((now - start) / period) + 1
+        delay = start + tick * period - time.perf_counter()
+        if delay > 0:
+            self.sleep(delay)
+        return tick
+
+
+class EventPoster:
+    """Posts events from a daemon thread so pacing loops never block on the bridge.
+
+    Loops enqueue (event, location) and move on; the poster thread applies the
+    location and calls CGEventPost. Mutation of a reused event therefore
+    happens only on the poster thread. If the small queue is full the event is
+    dropped and counted rather than delaying the next tick. Use as a context
+    manager: leaving the block waits for queued events to be posted.
+    """
+
+    def __init__(self, maxsize: int = 4) -> None:
+        self.dropped = 0
+        self._queue: queue.Queue[tuple[Any, Any] | None] = queue.Queue(maxsize)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        # Posting is on the pacing path, so it gets the same QoS as the loops.
+        set_thread_qos(QOS_CLASS_USER_INTERACTIVE)
+        while (item := self._queue.get()) is not None:
+            try:
+                event, location = item
+                if location is not None:
+                    CGEventSetLocation(event, location)
+                CGEventPost(kCGHIDEventTap, event)
+            except Exception:
+                # A failed post loses one event; it must not kill the poster
+                # and leave drain() waiting on a task nobody will finish.
+                self.dropped += 1
+            finally:
+                self._queue.task_done()
+
+    def post(self, event: Any, location: Any = None) -> None:
+        try:
+            self._queue.put_nowait((event, location))
+        except queue.Full:
+            self.dropped += 1
+
+    def drain(self) -> None:
+        """Block until everything queued so far has been posted, or the poster has died."""
+        done = self._queue.all_tasks_done
+        with done:
+            while self._queue.unfinished_tasks and self._thread.is_alive():
+                done.wait(0.1)
+
+    def __enter__(self) -> EventPoster:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.drain()
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+THEME_CHANGED_NOTIFICATION = "AppleInterfaceThemeChangedNotification"
+
+
+class AppearanceWatcher:
+    """Counts light/dark appearance changes as the system commits them."""
+
+    def __init__(self) -> None:
+        self.changes = 0
+        self._center = NSDistributedNotificationCenter.defaultCenter()
+        self._observer = self._center.addObserverForName_object_queue_usingBlock_(
+            THEME_CHANGED_NOTIFICATION, None, None, self._on_change
+        )
+
+    def _on_change(self, _note: Any) -> None:
+        self.changes += 1
+
+    def wait_for_change(self, seen: int, timeout: float) -> bool:
+        """Run the current run loop until more than `seen` changes arrived."""
+        deadline = time.perf_counter() + timeout
+        run_loop = NSRunLoop.currentRunLoop()
+        while self.changes <= seen:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False
+            run_loop.runUntilDate_(NSDate.dateWithTimeIntervalSinceNow_(min(remaining, 0.05)))
+        return True
 
+    def close(self) -> None:
+        self._center.removeObserver_(self._observer)
 
 
-def scenario_idle(duration: float, **_: Any) -> None:
+
+def scenario_idle(duration: float) -> None:
     """Do nothing. Measures noise floor — how the pipeline behaves with zero input."""
     print(f"  idle: waiting {duration:.1f}s (no input)")
     time.sleep(duration)
 
 
-def scenario_cursor(duration: float, **_: Any) -> None:
+def scenario_cursor(duration: float) -> None:
     """Sweep cursor in a smooth sine wave across the screen.
 
     Produces moderate, predictable pixel changes — mostly small delta frames
     since only the cursor region changes between frames.
     """
-    w, h = get_main_display_size()
+    w, h = DISPLAY_SIZE
     print(f"  cursor: sine sweep across {w}x{h} for {duration:.1f}s")
 
-    start = time.time()
-    step = 0
-    while time.time() - start < duration:
-        t = (time.time() - start) / duration
-        x = t * w
+    # The whole trajectory is known up front: build every point before the
+    # clock starts so each tick only repositions one reusable event and posts it.
+    period = 1 / 120  # 120 Hz input rate
+    wait_for_tick = PrecisionSleeper().wait_for_tick
+    n = max(1, int(duration / period))
+    points = []
+    for i in range(n):
+        t = i / n
         y = h / 2 + math.sin(t * math.pi * 6) * (h * 0.3)
-        move_mouse(x, max(0, min(h - 1, y)))
-        step += 1
-        time.sleep(1 / 120)  # 120 Hz input rate
+        points.append(CGPointMake(t * w, max(0, min(h - 1, y))))
+
+    moved_evt = CGEventCreateMouseEvent(EVENT_SOURCE, kCGEventMouseMoved, points[0], 0)
+
+    with EventPoster() as poster:
+        post = poster.post
+        start = time.perf_counter()
+        step = 0
+        tick = 0
+        while tick < n:
+            post(moved_evt, points[tick])
+            step += 1
+            tick = wait_for_tick(start, tick + 1, period)
 
-    print(f"    {step} cursor moves generated")
+    print(f"    {step} cursor moves generated ({poster.dropped} dropped)")
 
 
-def scenario_scroll(duration: float, **_: Any) -> None:
+def scenario_scroll(duration: float) -> None:
     """Scroll up and down in a repeating pattern.
 
     Produces large delta frames since scrolling shifts every visible pixel.
     Good stress test for delta compression + NEON blit path.
     """
-    w, h = get_main_display_size()
-    move_mouse(w / 2, h / 2)
+    move_mouse(*DISPLAY_CENTER)
     time.sleep(0.1)
 
     print(f"  scroll: alternating up/down for {duration:.1f}s")
-    start = time.time()
-    step = 0
-    direction = -3  # pixels per scroll event (negative = scroll down)
-
-    while time.time() - start < duration:
-        scroll(0, direction)
-        step += 1
-        elapsed = time.time() - start
-        if int(elapsed / 2) % 2 == 1:
-            direction = 3
-        else:
-            direction = -3
-        time.sleep(1 / 30)  # 30 Hz scroll rate
+    period = 1 / 30  # 30 Hz scroll rate
+    wait_for_tick = PrecisionSleeper().wait_for_tick
+    n = max(1, int(duration / period))
+    flip_ticks = round(SCROLL_FLIP_S / period)
+    # Only two distinct events are ever posted (negative = scroll down), so
+    # build both once and lay out which one each tick posts up front.
+    down_evt = CGEventCreateScrollWheelEvent(EVENT_SOURCE, kCGScrollEventUnitPixel, 2, -SCROLL_STEP_PX, 0)
+    up_evt = CGEventCreateScrollWheelEvent(EVENT_SOURCE, kCGScrollEventUnitPixel, 2, SCROLL_STEP_PX, 0)
+    schedule = [up_evt if (i // flip_ticks) % 2 else down_evt for i in range(n)]
+
+    with EventPoster() as poster:
+        post = poster.post
+        start = time.perf_counter()
+        step = 0
+        tick = 0
+        while tick < n:
+            post(schedule[tick])
+            step += 1
+            tick = wait_for_tick(start, tick + 1, period)
 
-    print(f"    {step} scroll events generated")
+    print(f"    {step} scroll events generated ({poster.dropped} dropped)")
 
 
-def scenario_typing(duration: float, **_: Any) -> None:
+def scenario_typing(duration: float) -> None:
     """Simulate typing by pressing letter keys.
 
     Opens TextEdit first (if not running) for a visible text target.
     Produces small, localized delta frames — text cursor + new character.
     """
-    result = subprocess.run(
-        ["pgrep", "-x", "TextEdit"], capture_output=True, text=True, check=False
-    )
+    # Keystrokes go to TextEdit directly rather than through the global HID
+    # tap; falls back to the tap if the PID can't be resolved.
+    pid = running_pid(TEXTEDIT_BUNDLE_ID)
     opened_textedit = False
-    if result.returncode != 0:
+    if pid is None:
         print("  typing: opening TextEdit...")
         subprocess.Popen(
             ["open", "-a", "TextEdit"],
@@ -179,196 +473,250 @@ def scenario_typing(duration: float, **_: Any) -> None:
         )
         opened_textedit = True
         time.sleep(1.5)
-
-    # macOS virtual keycodes are non-sequential; this maps a-z in order
-    letter_keycodes = [
-        0, 11, 8, 2, 14, 3, 5, 4, 34, 38, 40, 37, 46,   # a-m
-        45, 31, 35, 12, 15, 1, 17, 32, 9, 13, 7, 16, 6,  # n-z
-    ]
-    space_keycode = 49
-    return_keycode = 36
+        pid = running_pid(TEXTEDIT_BUNDLE_ID)
 
     print(f"  typing: simulated keystrokes for {duration:.1f}s")
-    start = time.time()
-    step = 0
-    word_len = 0
+    period = 1 / 15  # ~15 chars/sec (fast typing)
+    wait_for_tick = PrecisionSleeper().wait_for_tick
+    n = max(1, int(duration / period))
 
-    while time.time() - start < duration:
+    # The typed text is fixed: a-z cycling in 8-letter words, with a newline
+    # after every 40th keystroke. Lay out each tick's characters up front.
+    chunks = []
+    word_len = 0
+    for step in range(1, n + 1):
         if word_len >= 8:
-            key_tap(space_keycode)
+            chunk = " "
             word_len = 0
         else:
-            idx = step % len(letter_keycodes)
-            key_tap(letter_keycodes[idx])
+            chunk = string.ascii_lowercase[(step - 1) % 26]
             word_len += 1
-
-        step += 1
         if step % 40 == 0:
-            key_tap(return_keycode)
+            chunk += "\r"
             word_len = 0
+        chunks.append(chunk)
+
+    # One reused key-down carries each tick's text as a Unicode string, so
+    # no keycode map is needed. The key-up is posted straight after it from
+    # the same thread, which keeps them ordered without an intra-tap pause.
+    key_down = CGEventCreateKeyboardEvent(EVENT_SOURCE, 0, True)
+    key_up = CGEventCreateKeyboardEvent(EVENT_SOURCE, 0, False)
+    set_text = CGEventKeyboardSetUnicodeString
+    if pid is None:
+        post = functools.partial(CGEventPost, kCGHIDEventTap)
+    else:
+        post = functools.partial(CGEventPostToPid, pid)
 
-        time.sleep(1 / 15)  # ~15 chars/sec (fast typing)
+    start = time.perf_counter()
+    step = 0
+    tick = 0
+    while tick < n:
+        chunk = chunks[tick]
+        set_text(key_down, len(chunk), chunk)
+        post(key_down)
+        post(key_up)
+        step += 1
+        tick = wait_for_tick(start, tick + 1, period)
 
     print(f"    {step} keystrokes generated")
 
     if opened_textedit:
         time.sleep(0.3)
-        cmd_down = CGEventCreateKeyboardEvent(None, 13, True)  # keycode 13 = W
+        cmd_down = CGEventCreateKeyboardEvent(EVENT_SOURCE, 13, True)  # keycode 13 = W
         CGEventSetIntegerValueField(cmd_down, Quartz.kCGKeyboardEventAutorepeat, 0)
         Quartz.CGEventSetFlags(cmd_down, Quartz.kCGEventFlagMaskCommand)
         CGEventPost(kCGHIDEventTap, cmd_down)
-        cmd_up = CGEventCreateKeyboardEvent(None, 13, False)
+        cmd_up = CGEventCreateKeyboardEvent(EVENT_SOURCE, 13, False)
         Quartz.CGEventSetFlags(cmd_up, Quartz.kCGEventFlagMaskCommand)
         CGEventPost(kCGHIDEventTap, cmd_up)
         time.sleep(0.5)
-        d_down = CGEventCreateKeyboardEvent(None, 2, True)  # keycode 2 = D ("Don't Save")
+        d_down = CGEventCreateKeyboardEvent(EVENT_SOURCE, 2, True)  # keycode 2 = D ("Don't Save")
         Quartz.CGEventSetFlags(d_down, Quartz.kCGEventFlagMaskCommand)
         CGEventPost(kCGHIDEventTap, d_down)
-        d_up = CGEventCreateKeyboardEvent(None, 2, False)
+        d_up = CGEventCreateKeyboardEvent(EVENT_SOURCE, 2, False)
         Quartz.CGEventSetFlags(d_up, Quartz.kCGEventFlagMaskCommand)
         CGEventPost(kCGHIDEventTap, d_up)
 
 
-def scenario_drag(duration: float, **_: Any) -> None:
+def scenario_drag(duration: float) -> None:
     """Click-drag in a rectangular pattern across the screen.
 
     This simulates window dragging — moderate delta frames concentrated
     around the drag region.
     """
-    w, h = get_main_display_size()
-    margin = 100
-    cx, cy = w / 2, h / 2
+    cx, cy = DISPLAY_CENTER
+    rect = DRAG_RECT
 
     print(f"  drag: rectangular pattern for {duration:.1f}s")
 
-    rect = [
-        (margin, margin),
-        (w - margin, margin),
-        (w - margin, h - margin),
-        (margin, h - margin),
-    ]
-
-    start = time.time()
+    period = 1 / 120  # 120 Hz drag rate
+    wait_for_tick = PrecisionSleeper().wait_for_tick
+    steps_to_target = 30
+    # Every rectangle starts from the centre and walks the same corners, so
+    # each side's interpolated points are built once; the paced loop only
+    # enqueues a precomputed point and waits.
+    fracs = [(i + 1) / steps_to_target for i in range(steps_to_target)]
+    sides = []
+    sx, sy = cx, cy
+    for tx, ty in rect:
+        dx, dy = tx - sx, ty - sy
+        sides.append(((tx, ty), [CGPointMake(sx + dx * f, sy + dy * f) for f in fracs]))
+        sx, sy = tx, ty
+
+    drag_evt = CGEventCreateMouseEvent(EVENT_SOURCE, kCGEventLeftMouseDragged, CGPointMake(0, 0), 0)
+    start = time.perf_counter()
+    end = start + duration
     step = 0
 
-    while time.time() - start < duration:
-        sx, sy = cx, cy
-        mouse_down(sx, sy)
-        time.sleep(0.05)
-
-        for tx, ty in rect:
-            steps_to_target = 30
-            for i in range(steps_to_target):
-                frac = (i + 1) / steps_to_target
-                ix = sx + (tx - sx) * frac
-                iy = sy + (ty - sy) * frac
-                mouse_drag(ix, iy)
-                time.sleep(1 / 120)
-            sx, sy = tx, ty
-            step += 1
-
-            if time.time() - start >= duration:
-                break
+    with EventPoster() as poster:
+        post = poster.post
+        while time.perf_counter() < end:
+            sx, sy = cx, cy
+            mouse_down(sx, sy)
+            time.sleep(0.05)
+
+            drag_start = time.perf_counter()
+            tick = 0
+            for (sx, sy), points in sides:
+                for point in points:
+                    post(drag_evt, point)
+                    tick = wait_for_tick(drag_start, tick + 1, period)
+                step += 1
+
+                if time.perf_counter() >= end:
+                    break
 
-        mouse_up(sx, sy)
-        time.sleep(0.1)
+            poster.drain()  # the release must not overtake queued drags
+            mouse_up(sx, sy)
+            time.sleep(0.1)
 
-    print(f"    {step} drag segments completed")
+    print(f"    {step} drag segments completed ({poster.dropped} events dropped)")
 
 
-def scenario_stress(duration: float, **_: Any) -> None:
+def scenario_stress(duration: float) -> None:
     """Rapidly toggle between light and dark mode to force full-screen redraws.
 
     This is the worst case for delta compression — every pixel changes.
     Uses AppleScript to toggle appearance, falling back to rapid app switching.
+    When the appearance-change notification is observable, each toggle is
+    issued as soon as the previous one has been committed rather than on a
+    fixed 0.8s cadence.
     """
     print(f"  stress: rapid appearance toggle for {duration:.1f}s")
-    start = time.time()
+    wait_for_tick = PrecisionSleeper().wait_for_tick
+    start = time.perf_counter()
+    end = start + duration
     toggles = 0
+    commit_ms: list[float] = []
 
-    check = subprocess.run(
-        ["osascript", "-e", 'tell application "System Events" to get dark mode of appearance preferences'],
-        capture_output=True, text=True, check=False,
-    )
-    can_toggle = check.returncode == 0
+    # AppleInterfaceStyle is "Dark" in dark mode and unset in light mode.
+    can_toggle = NSUserDefaults is not None
 
     if can_toggle:
-        original_dark = "true" in check.stdout.strip().lower()
-        while time.time() - start < duration:
-            subprocess.run(
-                ["osascript", "-e",
-                 'tell application "System Events" to set dark mode of appearance preferences to not (dark mode of appearance preferences)'],
-                capture_output=True, check=False,
-            )
-            toggles += 1
-            time.sleep(0.8)
-
-        mode = "true" if original_dark else "false"
-        subprocess.run(
-            ["osascript", "-e",
-             f'tell application "System Events" to set dark mode of appearance preferences to {mode}'],
-            capture_output=True, check=False,
+        style = NSUserDefaults.standardUserDefaults().stringForKey_("AppleInterfaceStyle")
+        original_dark = style == "Dark"
+        # One interactive osascript for the whole run: each toggle is a line
+        # written to its stdin instead of a fresh osascript fork/exec.
+        script = subprocess.Popen(
+            ["osascript", "-i"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
         )
-    else:
-        print("    (appearance toggle not available, using rapid cursor sweep)")
-        w, h = get_main_display_size()
-        while time.time() - start < duration:
-            for i in range(0, max(w, h), 4):
-                x = min(i, w - 1)
-                y = min(i, h - 1)
-                move_mouse(x, y)
-                time.sleep(1 / 240)
-                if time.time() - start >= duration:
+        assert script.stdin is not None
+        watcher = AppearanceWatcher() if NSDistributedNotificationCenter is not None else None
+        try:
+            tick = 0
+            while time.perf_counter() < end:
+                seen = watcher.changes if watcher else 0
+                issued = time.perf_counter()
+                script.stdin.write(
+                    'tell application "System Events" to set dark mode of appearance preferences'
+                    " to not (dark mode of appearance preferences)\n"
+                )
+                script.stdin.flush()
+                toggles += 1
+                if watcher is None:
+                    tick = wait_for_tick(start, tick + 1, 0.8)
+                elif watcher.wait_for_change(seen, timeout=2.0):
+                    commit_ms.append((time.perf_counter() - issued) * 1000)
+                elif toggles == 1:
+                    # The first toggle never landed: System Events automation
+                    # is not permitted, so fall back to the cursor sweep.
+                    can_toggle = False
+                    toggles = 0
                     break
-            toggles += 1
+        finally:
+            if watcher is not None:
+                watcher.close()
+            mode = "true" if original_dark else "false"
+            script.stdin.write(
+                f'tell application "System Events" to set dark mode of appearance preferences to {mode}\n'
+            )
+            script.stdin.close()
+            try:
+                script.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                script.kill()
+
+    if not can_toggle:
+        print("    (appearance toggle not available, using rapid cursor sweep)")
+        w, h = DISPLAY_SIZE
+        # Sweep points are fixed for the run; build them once so the 240 Hz
+        # body is just enqueue + wait, with no per-tick arithmetic or clock
+        # reads beyond the tick wait itself.
+        sweep = [CGPointMake(min(i, w - 1), min(i, h - 1)) for i in range(0, max(w, h), 4)]
+        moved_evt = CGEventCreateMouseEvent(EVENT_SOURCE, kCGEventMouseMoved, sweep[0], 0)
+        period = 1 / 240
+        n = int(duration / period)
+        tick = 0
+        with EventPoster() as poster:
+            post = poster.post
+            while tick < n:
+                for point in sweep:
+                    post(moved_evt, point)
+                    tick = wait_for_tick(start, tick + 1, period)
+                    if tick >= n:
+                        break
+                toggles += 1
+        if poster.dropped:
+            print(f"    {poster.dropped} sweep events dropped")
 
     print(f"    {toggles} stress cycles completed")
+    if commit_ms:
+        print(f"    toggle → commit: avg {sum(commit_ms) / len(commit_ms):.0f}ms over {len(commit_ms)} toggles")
+
+
 
+Scenario = collections.namedtuple("Scenario", "fn default_duration description rate_hz")
 
+SCENARIOS: Mapping[str, Scenario] = MappingProxyType({
+    "idle": Scenario(scenario_idle, 10, "No input — measures noise floor", None),
+    "cursor": Scenario(scenario_cursor, 10, "Smooth sine-wave cursor sweep", 120),
+    "scroll": Scenario(scenario_scroll, 10, "Alternating scroll wheel events", 30),
+    "typing": Scenario(scenario_typing, 15, "Simulated keystroke input", 15),
+    "drag": Scenario(scenario_drag, 10, "Click-drag rectangular pattern", 120),
+    "stress": Scenario(scenario_stress, 10, "Rapid full-screen redraws (dark/light toggle)", 240),
+})
 
-SCENARIOS: dict[str, dict[str, Any]] = {
-    "idle": {
-        "fn": scenario_idle,
-        "default_duration": 10,
-        "description": "No input — measures noise floor",
-    },
-    "cursor": {
-        "fn": scenario_cursor,
-        "default_duration": 10,
-        "description": "Smooth sine-wave cursor sweep",
-    },
-    "scroll": {
-        "fn": scenario_scroll,
-        "default_duration": 10,
-        "description": "Alternating scroll wheel events",
-    },
-    "typing": {
-        "fn": scenario_typing,
-        "default_duration": 15,
-        "description": "Simulated keystroke input",
-    },
-    "drag": {
-        "fn": scenario_drag,
-        "default_duration": 10,
-        "description": "Click-drag rectangular pattern",
-    },
-    "stress": {
-        "fn": scenario_stress,
-        "default_duration": 10,
-        "description": "Rapid full-screen redraws (dark/light toggle)",
-    },
-}
-
-FULL_ORDER = ["idle", "cursor", "scroll", "typing", "drag", "stress", "idle"]
+FULL_ORDER = ("idle", "cursor", "scroll", "typing", "drag", "stress", "idle")
+SCENARIO_CHOICES = (*SCENARIOS, "full")
 
 
 def run_scenario(name: str, duration: float | None = None) -> None:
     """Run a single scenario."""
     spec = SCENARIOS[name]
-    dur = duration if duration is not None else spec["default_duration"]
-    print(f"\n[scenario: {name}] — {spec['description']}")
-    spec["fn"](duration=dur)
-    print(f"  done ({dur:.1f}s)")
+    dur = duration if duration is not None else spec.default_duration
+    print(f"\n[scenario: {name}] — {spec.description}")
+    # Display reconfiguration callbacks are only delivered while the main run
+    # loop runs; give pending ones a chance so geometry is current.
+    Quartz.CFRunLoopRunInMode(Quartz.kCFRunLoopDefaultMode, 0, True)
+    started = time.perf_counter()
+    with realtime_qos(spec.rate_hz):
+        spec.fn(dur)
+    print(f"  done ({time.perf_counter() - started:.1f}s of {dur:.1f}s)")
 
 
 def run_full(duration_per: float | None = None) -> None:
@@ -377,12 +725,12 @@ def run_full(duration_per: float | None = None) -> None:
     print("LATENCY LAB — FULL SCENARIO SUITE")
     print("=" * 50)
 
-    total_start = time.time()
+    total_start = time.perf_counter()
     for name in FULL_ORDER:
         run_scenario(name, duration=duration_per)
         time.sleep(1)
 
-    elapsed = time.time() - total_start
+    elapsed = time.perf_counter() - total_start
     print(f"\n{'=' * 50}")
     print(f"Full suite completed in {elapsed:.1f}s")
 
@@ -393,7 +741,7 @@ def main() -> int:
     )
     parser.add_argument(
         "--scenario",
-        choices=list(SCENARIOS.keys()) + ["full"],
+        choices=SCENARIO_CHOICES,
         default="full",
         help="Scenario to run (default: full)",
     )
@@ -413,7 +761,7 @@ def main() -> int:
     if args.list:
         print("Available scenarios:")
         for name, spec in SCENARIOS.items():
-            print(f"  {name:12s} ({spec['default_duration']:2d}s)  {spec['description']}")
+            print(f"  {name:12s} ({spec.default_duration:2d}s)  {spec.description}")
         print(f"  {'full':12s}         All scenarios in sequence")
         return 0
 
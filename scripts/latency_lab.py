@@ -9,19 +9,29 @@ stores an experiment ledger for follow-up AI agents.
 from __future__ import annotations
 
 import argparse
+import contextlib
+import ctypes
+import functools
 import json
+import mmap
+import operator
 import os
+import select
 import shlex
 import signal
+import socket
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from statistics import mean
-from typing import Any
+from typing import Any, Callable, ContextManager, Iterable, Iterator
 
+from lab_logcat import parse_stats_line
 
 NUMERIC_KEYS = {
     "fps",
@@ -35,7 +45,17 @@ NUMERIC_KEYS = {
     "compress_ms",
 }
 
+# Raw key bytes -> key name, so status lines are matched without decoding.
+NUMERIC_KEYS_B = {key.encode(): key for key in NUMERIC_KEYS}
+
+STATUS_READ_BYTES = 64 * 1024
+
 SOCKET_PATH = "/tmp/daylight-mirror.sock"
+LATENCY_REQUEST = b"LATENCY\n"
+REPLY_BUF_BYTES = 64 * 1024
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
 
 
 @dataclass
@@ -47,8 +67,82 @@ class CommandResult:
     duration_s: float
 
 
+def _opt_float(value: Any) -> float | None:
+    return None if value is None else float(value)
+
+
+@dataclass(frozen=True)
+class Gates:
+    """Pass/fail thresholds from the plan's "gates", coerced once at load."""
+
+    fps_min: float | None = None
+    jitter_ms_max: float | None = None
+    skipped_frames_delta_max: float | None = None
+    rtt_avg_delta_max: float | None = None
+    rtt_p95_delta_max: float | None = None
+
+    @classmethod
+    def from_plan(cls, gates: dict[str, Any]) -> Gates:
+        return cls(
+            fps_min=_opt_float(gates.get("fps_min")),
+            jitter_ms_max=_opt_float(gates.get("jitter_ms_max")),
+            skipped_frames_delta_max=_opt_float(gates.get("skipped_frames_delta_max")),
+            rtt_avg_delta_max=_opt_float(gates.get("rtt_avg_delta_max")),
+            rtt_p95_delta_max=_opt_float(gates.get("rtt_p95_delta_max")),
+        )
+
+    @functools.cached_property
+    def checks(self) -> tuple[tuple[str, str, Callable[[float, float], bool], float, str], ...]:
+        """(source, key, violates, limit, message) rows for the configured gates only.
+
+        source is "averages" or "deltas" (read from the metrics) or "baseline"
+        (the averages' increase over the baseline run's averages).
+        """
+        table = (
+            ("averages", "fps", operator.lt, self.fps_min, "fps {v} < min {t}"),
+            ("averages", "jitter_ms", operator.gt, self.jitter_ms_max, "jitter_ms {v} > max {t}"),
+            ("deltas", "skipped_frames", operator.gt, self.skipped_frames_delta_max, "skipped_frames delta {v} > max {t}"),
+            ("baseline", "rtt_avg_ms", operator.gt, self.rtt_avg_delta_max, "rtt_avg_ms delta +{v} > max {t}"),
+            ("baseline", "rtt_p95_ms", operator.gt, self.rtt_p95_delta_max, "rtt_p95_ms delta +{v} > max {t}"),
+        )
+        return tuple(row for row in table if row[3] is not None)
+
+    @functools.cached_property
+    def active_keys(self) -> frozenset[str]:
+        """Metric keys read by at least one configured gate."""
+        return frozenset(key for _, key, _, _, _ in self.checks)
+
+
+_UTC = timezone.utc
+
+
 def now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    return datetime.now(_UTC).isoformat(timespec="milliseconds")
+
+
+# Reused encoder: json.dumps with indent= builds a fresh JSONEncoder per call.
+_INDENTED_JSON = json.JSONEncoder(indent=2, ensure_ascii=True)
+
+
+def dumps_indented(obj: Any) -> bytes:
+    return (_INDENTED_JSON.encode(obj) + "\n").encode("ascii")
+
+
+MMAP_MIN_BYTES = 64 * 1024
+
+
+def read_json(path: Path) -> Any:
+    """Load a JSON file, decoding large files straight from a read-only mapping.
+
+    Decoding the mapped pages skips the intermediate bytes copy that read()
+    would make; below MMAP_MIN_BYTES the mapping setup costs more than it saves.
+    """
+    with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_MIN_BYTES:
+            return json.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return json.loads(str(mm, "utf-8"))
 
 
 def ensure_dir(path: Path) -> None:
@@ -63,115 +157,333 @@ def as_argv(command: Any) -> list[str]:
     raise ValueError(f"Unsupported command format: {command!r}")
 
 
-def run_command(command: Any, cwd: Path, timeout_s: int = 300, dry_run: bool = False) -> CommandResult:
-    argv = as_argv(command)
-    start = time.time()
+def normalize_plan(plan: dict[str, Any]) -> None:
+    """Convert every command in the plan to an argv list, in place, once at load.
+
+    Raises ValueError for a command that is neither a string nor a list.
+    """
+    for exp in plan.get("experiments", []):
+        exp["commands"] = [as_argv(command) for command in exp.get("commands", [])]
+    daemon = plan.get("daemon", {})
+    for key in ("start", "stop"):
+        if daemon.get(key):
+            daemon[key] = as_argv(daemon[key])
+
+
+def run_command(
+    command: list[str],
+    cwd: Path,
+    timeout_s: int = 300,
+    dry_run: bool = False,
+    capture: bool = True,
+) -> CommandResult:
+    """Run the argv list `command`, capturing output as bytes and decoding once at the end.
+
+    With capture=False the output goes to /dev/null and the result's
+    stdout/stderr are empty.
+    """
+    argv = command
+    start = time.monotonic()
     if dry_run:
         return CommandResult(argv=argv, returncode=0, stdout="", stderr="", duration_s=0.0)
 
+    output = subprocess.PIPE if capture else subprocess.DEVNULL
     proc = subprocess.run(
         argv,
         cwd=str(cwd),
-        capture_output=True,
-        text=True,
+        stdout=output,
+        stderr=output,
         timeout=timeout_s,
         check=False,
     )
     return CommandResult(
         argv=argv,
         returncode=proc.returncode,
-        stdout=proc.stdout.strip(),
-        stderr=proc.stderr.strip(),
-        duration_s=time.time() - start,
+        stdout=proc.stdout.decode("utf-8", errors="replace").strip() if capture else "",
+        stderr=proc.stderr.decode("utf-8", errors="replace").strip() if capture else "",
+        duration_s=time.monotonic() - start,
     )
 
 
-def parse_status_file(path: Path) -> dict[str, Any]:
-    if not path.exists():
-        return {}
-
+def parse_status_bytes(raw: bytes) -> dict[str, Any]:
+    """Parse key=value status lines; lines without '=' (e.g. "OK") are skipped."""
     data: dict[str, Any] = {}
-    for line in path.read_text(encoding="utf-8").splitlines():
-        if "=" not in line:
+    for line in raw.splitlines():
+        key, sep, value = line.partition(b"=")
+        if not sep:
             continue
-        key, value = line.split("=", 1)
         key = key.strip()
-        value = value.strip()
-        if key in NUMERIC_KEYS:
+        name = NUMERIC_KEYS_B.get(key)
+        if name is not None:
             try:
-                data[key] = float(value)
+                data[name] = float(value)
             except ValueError:
-                data[key] = None
+                data[name] = None
         else:
-            data[key] = value
+            data[key.decode("utf-8", errors="replace")] = value.strip().decode("utf-8", errors="replace")
     return data
 
 
-def query_socket(socket_path: str = SOCKET_PATH) -> dict[str, Any]:
-    import socket as sock
-    data: dict[str, Any] = {}
+def parse_status_file(path: Path) -> dict[str, Any]:
+    # The mirror replaces the file by rename on every update, so a descriptor
+    # held across samples would keep reading the old inode; open per sample,
+    # but as a bare open + single read + close instead of Path.read_bytes.
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+    except FileNotFoundError:
+        return {}
+    try:
+        raw = os.read(fd, STATUS_READ_BYTES)
+    finally:
+        os.close(fd)
+    return parse_status_bytes(raw)
+
+
+def open_status_socket(socket_path: str = SOCKET_PATH) -> socket.socket:
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
     try:
-        s = sock.socket(sock.AF_UNIX, sock.SOCK_STREAM)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, REPLY_BUF_BYTES)
         s.settimeout(3.0)
         s.connect(socket_path)
-        s.sendall(b"LATENCY\n")
-        response = b""
-        while True:
-            chunk = s.recv(4096)
-            if not chunk:
-                break
-            response += chunk
+    except OSError:
         s.close()
-    except (OSError, sock.timeout):
+        raise
+    return s
+
+
+def query_socket(socket_path: str = SOCKET_PATH) -> dict[str, Any]:
+    # The control socket answers one command per connection and then closes,
+    # so each sample connects afresh; EOF delimits the reply. The reply is
+    # received into one preallocated buffer rather than concatenated per recv.
+    buf = bytearray(REPLY_BUF_BYTES)
+    view = memoryview(buf)
+    size = 0
+    try:
+        with open_status_socket(socket_path) as s:
+            s.sendall(LATENCY_REQUEST)
+            while size < REPLY_BUF_BYTES:
+                n = s.recv_into(view[size:])
+                if not n:
+                    break
+                size += n
+    except OSError:
         return {}
+    return parse_status_bytes(view[:size].tobytes())
 
-    for line in response.decode("utf-8", errors="replace").splitlines():
-        if line.startswith("OK"):
-            continue
-        if "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip()
-        value = value.strip()
-        if key in NUMERIC_KEYS:
+
+class DirectoryWatch:
+    """Blocks until entries in a directory are written or renamed into place.
+
+    Uses inotify on Linux and kqueue on macOS/BSD. `open` returns None where
+    neither is available.
+    """
+
+    def __init__(self, fd: int, kq: Any = None) -> None:
+        self.fd = fd
+        self.kq = kq
+
+    @classmethod
+    def open(cls, directory: Path) -> DirectoryWatch | None:
+        if sys.platform.startswith("linux"):
             try:
-                data[key] = float(value)
-            except ValueError:
-                data[key] = None
+                libc = ctypes.CDLL(None, use_errno=True)
+                fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            except (OSError, AttributeError):
+                return None
+            if fd < 0:
+                return None
+            if libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+                os.close(fd)
+                return None
+            return cls(fd)
+        if hasattr(select, "kqueue"):
+            try:
+                fd = os.open(directory, os.O_RDONLY)
+            except OSError:
+                return None
+            kq = None
+            try:
+                kq = select.kqueue()
+                kq.control(
+                    [
+                        select.kevent(
+                            fd,
+                            filter=select.KQ_FILTER_VNODE,
+                            flags=select.KQ_EV_ADD | select.KQ_EV_CLEAR,
+                            fflags=select.KQ_NOTE_WRITE,
+                        )
+                    ],
+                    0,
+                    0,
+                )
+            except OSError:
+                if kq is not None:
+                    kq.close()
+                os.close(fd)
+                return None
+            return cls(fd, kq)
+        return None
+
+    def wait(self, timeout: float) -> bool:
+        """True if the directory changed within `timeout` seconds."""
+        if self.kq is not None:
+            return bool(self.kq.control(None, 1, timeout))
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        if self.kq is not None:
+            self.kq.close()
+        os.close(self.fd)
+
+
+def _stat_key(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+def watch_status(status_file: Path, duration_s: float, poll_s: float) -> Iterator[None]:
+    """Yield once immediately, then each time `status_file` is replaced, for `duration_s`.
+
+    The mirror rewrites the status file atomically (write + rename), so the
+    parent directory is watched and unrelated activity in it is filtered out
+    by the file's inode and mtime. Without a directory watch this falls back
+    to yielding every `poll_s` seconds.
+    """
+    deadline = time.monotonic() + duration_s
+    watch = DirectoryWatch.open(status_file.parent)
+    if watch is None:
+        yield from poll_ticks(duration_s, poll_s)
+        return
+    try:
+        yield
+        last = _stat_key(status_file)
+        while (remaining := deadline - time.monotonic()) > 0:
+            if not watch.wait(remaining):
+                break
+            key = _stat_key(status_file)
+            if key != last:
+                last = key
+                yield
+    finally:
+        watch.close()
+
+
+def poll_ticks(duration_s: float, poll_s: float) -> Iterator[None]:
+    """Yield every `poll_s` seconds for `duration_s`, on the monotonic clock.
+
+    Ticks are scheduled from the previous deadline rather than from when the
+    caller finished its work, so sampling doesn't drift; if a sample overruns
+    a whole period, the schedule restarts from now instead of bursting.
+    """
+    now = time.monotonic()
+    deadline = now + duration_s
+    next_tick = now
+    while next_tick < deadline:
+        yield
+        next_tick += poll_s
+        sleep_for = next_tick - time.monotonic()
+        if sleep_for > 0:
+            time.sleep(sleep_for)
         else:
-            data[key] = value
-    return data
+            next_tick = time.monotonic()
+
+
+def run_deprioritized(plan: dict[str, Any], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call `fn` on a short-lived thread pinned to `overseer_cpu` and niced by `overseer_nice`.
+
+    Keeps the overseer's polling off the cores the mirror is being measured
+    on. Linux applies affinity and niceness per thread, so only this thread
+    is affected: builds and daemons spawned from the main thread keep their
+    full CPU set and priority. Elsewhere a thread id passed to setpriority
+    is not a thread, so `fn` runs as-is; where Linux refuses either call it
+    simply runs unpinned.
+    """
+    cpus = plan.get("overseer_cpu")
+    nice = int(plan.get("overseer_nice", 5 if cpus is not None else 0))
+    if not sys.platform.startswith("linux") or (cpus is None and not nice):
+        return fn(*args, **kwargs)
+    if isinstance(cpus, int):
+        cpus = [cpus]
+
+    def call() -> Any:
+        try:
+            if cpus is not None:
+                os.sched_setaffinity(0, set(cpus))
+            if nice:
+                tid = threading.get_native_id()
+                os.setpriority(os.PRIO_PROCESS, tid, os.getpriority(os.PRIO_PROCESS, tid) + nice)
+        except (AttributeError, OSError):
+            pass
+        return fn(*args, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(call).result()
 
 
-def sample_metrics(status_file: Path, duration_s: int, poll_s: float) -> dict[str, Any]:
-    started_at = time.time()
+def sample_metrics(
+    status_file: Path,
+    duration_s: int,
+    poll_s: float,
+    keys: Iterable[str] = NUMERIC_KEYS,
+) -> dict[str, Any]:
+    """Sample status for `duration_s` and aggregate the numeric `keys`."""
     samples: list[dict[str, Any]] = []
 
+    # The control socket answers on request, so it is polled; the status file
+    # is only re-read when the mirror has actually rewritten it.
     use_socket = os.path.exists(SOCKET_PATH)
+    ticks = poll_ticks(duration_s, poll_s) if use_socket else watch_status(status_file, duration_s, poll_s)
 
-    while time.time() - started_at < duration_s:
+    for _ in ticks:
         point = query_socket() if use_socket else parse_status_file(status_file)
         if not point and use_socket:
             point = parse_status_file(status_file)
         if point:
             point["sample_ts"] = now_iso()
             samples.append(point)
-        time.sleep(poll_s)
 
     if not samples:
         return {
             "sample_count": 0,
             "averages": {},
+            "stddevs": {},
             "first": {},
             "last": {},
             "deltas": {},
         }
 
+    # One pass over the samples with a running (Welford) mean and M2 per key;
+    # numeric values are already floats from the parsers.
+    keys = NUMERIC_KEYS.intersection(keys)
+    counts = dict.fromkeys(keys, 0)
+    means = dict.fromkeys(keys, 0.0)
+    m2s = dict.fromkeys(keys, 0.0)
+    for sample in samples:
+        for key, value in sample.items():
+            if value is None or key not in counts:
+                continue
+            n = counts[key] = counts[key] + 1
+            d = value - means[key]
+            means[key] += d / n
+            m2s[key] += d * (value - means[key])
+
     averages: dict[str, float] = {}
-    for key in NUMERIC_KEYS:
-        vals = [float(s[key]) for s in samples if s.get(key) is not None]
-        if vals:
-            averages[key] = round(mean(vals), 3)
+    stddevs: dict[str, float] = {}
+    for key, n in counts.items():
+        if n:
+            averages[key] = round(means[key], 3)
+            stddevs[key] = round((m2s[key] / (n - 1)) ** 0.5, 3) if n > 1 else 0.0
 
     first = samples[0]
     last = samples[-1]
@@ -183,47 +495,75 @@ def sample_metrics(status_file: Path, duration_s: int, poll_s: float) -> dict[st
     return {
         "sample_count": len(samples),
         "averages": averages,
+        "stddevs": stddevs,
         "first": first,
         "last": last,
         "deltas": deltas,
     }
 
 
-def start_logcat_capture(output_path: Path, dry_run: bool) -> subprocess.Popen[str] | None:
-    if dry_run:
-        return None
-    lab_logcat = Path(__file__).parent / "lab_logcat.py"
-    if not lab_logcat.exists():
-        return None
-    return subprocess.Popen(
-        [sys.executable, str(lab_logcat), "--output", str(output_path), "--follow"],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
-
+class AndroidCapture(threading.Thread):
+    """Reads DaylightMirror stats from adb logcat on a background thread.
+
+    adb is read directly in this process rather than through a lab_logcat.py
+    child interpreter; lines are parsed with the same parse_stats_line.
+    """
+
+    def __init__(self, output_path: Path) -> None:
+        super().__init__(daemon=True)
+        self.output_path = output_path
+        self.samples: list[dict[str, Any]] = []
+        subprocess.run(["adb", "logcat", "-c"], capture_output=True, check=False)
+        # Its own session, so teardown can signal adb and anything it spawned
+        # as one process group.
+        self.proc = subprocess.Popen(
+            ["adb", "logcat", "-s", "DaylightMirror:I"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=1 << 16,
+            start_new_session=hasattr(os, "killpg"),
+        )
 
-def stop_logcat_capture(proc: subprocess.Popen[str] | None) -> None:
-    if proc is None:
-        return
-    try:
-        proc.send_signal(signal.SIGINT)
-        proc.wait(timeout=5)
-    except (subprocess.TimeoutExpired, OSError):
-        proc.kill()
+    def run(self) -> None:
+        assert self.proc.stdout is not None
+        for raw in self.proc.stdout:
+            if b"FPS:" not in raw:
+                continue
+            sample = parse_stats_line(raw.decode("utf-8", "replace").strip())
+            if sample:
+                self.samples.append(sample)
+
+    def stop(self) -> None:
+        """Stop adb, wait for the reader, and write the samples to `output_path`."""
+        self._signal(signal.SIGINT)
         try:
-            proc.wait(timeout=3)
+            self.proc.wait(timeout=5)
         except subprocess.TimeoutExpired:
+            self._signal(signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+            self.proc.wait()
+        self.join(timeout=5)
+        self.output_path.write_bytes(dumps_indented({"samples": self.samples, "count": len(self.samples)}))
+
+    def _signal(self, sig: int) -> None:
+        if not hasattr(os, "killpg"):
+            self.proc.terminate()
+            return
+        try:
+            os.killpg(self.proc.pid, sig)
+        except ProcessLookupError:
             pass
 
 
-def load_android_metrics(output_path: Path) -> dict[str, Any]:
-    if not output_path.exists():
-        return {}
+def start_android_capture(output_path: Path) -> AndroidCapture | None:
     try:
-        data = json.loads(output_path.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError):
-        return {}
-    samples = data.get("samples", [])
+        capture = AndroidCapture(output_path)
+    except OSError:  # adb not installed
+        return None
+    capture.start()
+    return capture
+
+
+def load_android_metrics(samples: list[dict[str, Any]]) -> dict[str, Any]:
     if not samples:
         return {"android_sample_count": 0}
 
@@ -247,6 +587,9 @@ def load_android_metrics(output_path: Path) -> dict[str, Any]:
     }
 
 
+_WORKTREE_LOCK = threading.Lock()
+
+
 def build_worktree(repo_root: Path, git_cfg: dict[str, Any], exp: dict[str, Any], dry_run: bool) -> Path:
     if not git_cfg.get("use_worktrees", False):
         return repo_root
@@ -263,7 +606,9 @@ def build_worktree(repo_root: Path, git_cfg: dict[str, Any], exp: dict[str, Any]
         return wt_path
 
     command = ["git", "worktree", "add", "-B", branch, str(wt_path), base_ref]
-    result = run_command(command, cwd=repo_root, timeout_s=120, dry_run=dry_run)
+    # git takes repository-wide locks for this; parallel experiments take turns.
+    with _WORKTREE_LOCK:
+        result = run_command(command, cwd=repo_root, timeout_s=120, dry_run=dry_run)
     if result.returncode != 0:
         raise RuntimeError(f"worktree add failed for {exp_id}: {result.stderr or result.stdout}")
     return wt_path
@@ -273,46 +618,26 @@ def evaluate(
     exp_id: str,
     metrics: dict[str, Any],
     baseline_metrics: dict[str, Any] | None,
-    gates: dict[str, Any],
+    gates: Gates,
 ) -> tuple[str, list[str]]:
     reasons: list[str] = []
-    averages = metrics.get("averages", {})
-    deltas = metrics.get("deltas", {})
-
-    fps_min = gates.get("fps_min")
-    if fps_min is not None and averages.get("fps") is not None and averages["fps"] < float(fps_min):
-        reasons.append(f"fps {averages['fps']} < min {fps_min}")
-
-    jitter_max = gates.get("jitter_ms_max")
-    if jitter_max is not None and averages.get("jitter_ms") is not None and averages["jitter_ms"] > float(jitter_max):
-        reasons.append(f"jitter_ms {averages['jitter_ms']} > max {jitter_max}")
-
-    skipped_max_delta = gates.get("skipped_frames_delta_max")
-    if skipped_max_delta is not None and deltas.get("skipped_frames") is not None:
-        if deltas["skipped_frames"] > float(skipped_max_delta):
-            reasons.append(f"skipped_frames delta {deltas['skipped_frames']} > max {skipped_max_delta}")
-
-    if baseline_metrics:
-        base_avg = baseline_metrics.get("averages", {})
-        rtt_delta_max = gates.get("rtt_avg_delta_max")
-        if (
-            rtt_delta_max is not None
-            and averages.get("rtt_avg_ms") is not None
-            and base_avg.get("rtt_avg_ms") is not None
-        ):
-            delta = averages["rtt_avg_ms"] - base_avg["rtt_avg_ms"]
-            if delta > float(rtt_delta_max):
-                reasons.append(f"rtt_avg_ms delta +{round(delta, 3)} > max {rtt_delta_max}")
-
-        rtt_p95_delta_max = gates.get("rtt_p95_delta_max")
-        if (
-            rtt_p95_delta_max is not None
-            and averages.get("rtt_p95_ms") is not None
-            and base_avg.get("rtt_p95_ms") is not None
-        ):
-            delta = averages["rtt_p95_ms"] - base_avg["rtt_p95_ms"]
-            if delta > float(rtt_p95_delta_max):
-                reasons.append(f"rtt_p95_ms delta +{round(delta, 3)} > max {rtt_p95_delta_max}")
+    sources = {"averages": metrics.get("averages", {}), "deltas": metrics.get("deltas", {})}
+    base_avg = baseline_metrics.get("averages", {}) if baseline_metrics else None
+
+    for source, key, violates, limit, message in gates.checks:
+        if source == "baseline":
+            if base_avg is None:
+                continue
+            value, base = sources["averages"].get(key), base_avg.get(key)
+            if value is None or base is None:
+                continue
+            delta = value - base
+            if violates(delta, limit):
+                reasons.append(message.format(v=round(delta, 3), t=limit))
+        else:
+            value = sources[source].get(key)
+            if value is not None and violates(value, limit):
+                reasons.append(message.format(v=value, t=limit))
 
     if reasons:
         return "failed", reasons
@@ -321,19 +646,39 @@ def evaluate(
     return "passed", [f"{exp_id} met configured gates"]
 
 
-def append_jsonl(path: Path, payload: dict[str, Any]) -> None:
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(payload, ensure_ascii=True) + "\n")
+class LedgerWriter:
+    """Append-only JSONL ledger held open for a whole run.
+
+    Each entry goes to the kernel as it is written, so a crash mid-run still
+    leaves every finished experiment on disk. The record and its newline are
+    handed over in a single writev on an O_APPEND descriptor, with no user-space
+    buffer to copy through or flush.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_CLOEXEC", 0), 0o644)
+
+    def write(self, payload: dict[str, Any]) -> None:
+        record = json.dumps(payload, ensure_ascii=True).encode("ascii")
+        if hasattr(os, "writev"):
+            os.writev(self.fd, (record, b"\n"))
+        else:
+            os.write(self.fd, record + b"\n")
+
+    def close(self) -> None:
+        os.close(self.fd)
 
 
 def run_experiment(
     repo_root: Path,
     plan: dict[str, Any],
+    gates: Gates,
     exp: dict[str, Any],
     baseline_metrics: dict[str, Any] | None,
     dry_run: bool,
     run_dir: Path,
     android: bool = False,
+    sampling_lock: ContextManager[Any] | None = None,
 ) -> dict[str, Any]:
     exp_id = exp["id"]
     git_cfg = plan.get("git", {})
@@ -342,65 +687,73 @@ def run_experiment(
     warmup_s = int(exp.get("warmup_s", plan.get("default_warmup_s", 8)))
     measure_s = int(exp.get("measure_s", plan.get("default_measure_s", 25)))
     timeout_s = int(plan.get("command_timeout_s", 300))
-    gates = plan.get("gates", {})
+    # Only gated metrics plus those the plan asks to record are aggregated;
+    # without "always_record" every numeric metric is kept for the ledger.
+    record_keys = gates.active_keys.union(plan.get("always_record", NUMERIC_KEYS))
 
     started = now_iso()
     worktree = build_worktree(repo_root, git_cfg, exp, dry_run=dry_run)
     commands = exp.get("commands", [])
+    capture = bool(exp.get("capture_output", True))
     command_results: list[dict[str, Any]] = []
 
-    for command in commands:
-        r = run_command(command, cwd=worktree, timeout_s=timeout_s, dry_run=dry_run)
-        command_results.append(
-            {
-                "argv": r.argv,
-                "returncode": r.returncode,
-                "stdout": r.stdout,
-                "stderr": r.stderr,
-                "duration_s": round(r.duration_s, 3),
-            }
-        )
-        if r.returncode != 0:
-            return {
+    # Metrics are host-wide and commands may reconfigure the shared daemon;
+    # concurrent experiments may share this lock so that only one of them
+    # runs its commands, warms up and samples at a time.
+    with sampling_lock or contextlib.nullcontext():
+        for command in commands:
+            r = run_command(command, cwd=worktree, timeout_s=timeout_s, dry_run=dry_run, capture=capture)
+            command_results.append(
+                {
+                    "argv": r.argv,
+                    "returncode": r.returncode,
+                    "stdout": r.stdout,
+                    "stderr": r.stderr,
+                    "duration_s": round(r.duration_s, 3),
+                }
+            )
+            if r.returncode != 0:
+                return {
+                    "id": exp_id,
+                    "status": "blocked",
+                    "started_at": started,
+                    "finished_at": now_iso(),
+                    "worktree": str(worktree),
+                    "command_results": command_results,
+                    "reasons": [f"Command failed: {' '.join(r.argv)}", r.stderr or r.stdout],
+                    "metrics": {},
+                    "notes": exp.get("notes", ""),
+                }
+
+        if dry_run:
+            result = {
                 "id": exp_id,
-                "status": "blocked",
+                "status": "dry_run",
                 "started_at": started,
                 "finished_at": now_iso(),
                 "worktree": str(worktree),
                 "command_results": command_results,
-                "reasons": [f"Command failed: {' '.join(r.argv)}", r.stderr or r.stdout],
+                "reasons": ["Dry run: commands not executed, metrics not sampled"],
                 "metrics": {},
                 "notes": exp.get("notes", ""),
             }
+            out_file = run_dir / f"{exp_id}.json"
+            out_file.write_bytes(dumps_indented(result))
+            return result
 
-    if dry_run:
-        result = {
-            "id": exp_id,
-            "status": "dry_run",
-            "started_at": started,
-            "finished_at": now_iso(),
-            "worktree": str(worktree),
-            "command_results": command_results,
-            "reasons": ["Dry run: commands not executed, metrics not sampled"],
-            "metrics": {},
-            "notes": exp.get("notes", ""),
-        }
-        out_file = run_dir / f"{exp_id}.json"
-        out_file.write_text(json.dumps(result, indent=2, ensure_ascii=True) + "\n", encoding="utf-8")
-        return result
-
-    if not dry_run and warmup_s > 0:
-        time.sleep(warmup_s)
+        if not dry_run and warmup_s > 0:
+            time.sleep(warmup_s)
 
-    android_output = run_dir / f"{exp_id}.android.json"
-    logcat_proc = start_logcat_capture(android_output, dry_run=not android) if android else None
+        android_capture = start_android_capture(run_dir / f"{exp_id}.android.json") if android else None
 
-    metrics = sample_metrics(status_file, duration_s=measure_s, poll_s=poll_s)
+        metrics = run_deprioritized(
+            plan, sample_metrics, status_file, duration_s=measure_s, poll_s=poll_s, keys=record_keys
+        )
 
-    stop_logcat_capture(logcat_proc)
-    if android:
-        android_metrics = load_android_metrics(android_output)
-        metrics.update(android_metrics)
+        if android_capture is not None:
+            android_capture.stop()
+    if android_capture is not None:
+        metrics.update(load_android_metrics(android_capture.samples))
 
     status, reasons = evaluate(exp_id=exp_id, metrics=metrics, baseline_metrics=baseline_metrics, gates=gates)
 
@@ -417,7 +770,7 @@ def run_experiment(
     }
 
     out_file = run_dir / f"{exp_id}.json"
-    out_file.write_text(json.dumps(result, indent=2, ensure_ascii=True) + "\n", encoding="utf-8")
+    out_file.write_bytes(dumps_indented(result))
     return result
 
 
@@ -433,7 +786,7 @@ def maybe_start_stop_daemon(plan: dict[str, Any], repo_root: Path, dry_run: bool
     if not start_cmd:
         return None, state
 
-    argv = as_argv(start_cmd)
+    argv = start_cmd
     if dry_run:
         state["started"] = True
         return None, state
@@ -494,13 +847,21 @@ def main() -> int:
         print(f"Plan file not found: {plan_path}", file=sys.stderr)
         return 1
 
-    plan = json.loads(plan_path.read_text(encoding="utf-8"))
+    plan = read_json(plan_path)
     experiments = plan.get("experiments", [])
     if not experiments:
         print("No experiments in plan", file=sys.stderr)
         return 1
+    gates = Gates.from_plan(plan.get("gates", {}))
+    plan_snapshot = dumps_indented(plan)
+    try:
+        normalize_plan(plan)
+    except ValueError as exc:
+        print(f"Invalid plan: {exc}", file=sys.stderr)
+        return 1
 
-    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+    run_started = datetime.now(_UTC)
+    ts = run_started.astimezone().strftime("%Y%m%d-%H%M%S")  # run dirs are named in local time
     results_root = Path(plan.get("results_dir", "experiments/results"))
     if not results_root.is_absolute():
         results_root = (repo_root / results_root).resolve()
@@ -508,43 +869,106 @@ def main() -> int:
     ensure_dir(run_dir)
     ledger_path = results_root / "ledger.jsonl"
 
-    (run_dir / "plan.json").write_text(json.dumps(plan, indent=2, ensure_ascii=True) + "\n", encoding="utf-8")
+    (run_dir / "plan.json").write_bytes(plan_snapshot)
 
-    proc, daemon_state = maybe_start_stop_daemon(plan, repo_root, dry_run=args.dry_run)
+    # Opened before the daemon is spawned, so a failed open can't strand it.
+    ledger = LedgerWriter(ledger_path)
     summary: list[dict[str, Any]] = []
+    proc, daemon_state = maybe_start_stop_daemon(plan, repo_root, dry_run=args.dry_run)
+
+    record_lock = threading.Lock()
+
+    def record(result: dict[str, Any]) -> None:
+        with record_lock:
+            ledger.write(result)
+            summary.append({"id": result["id"], "status": result["status"], "reasons": result["reasons"]})
+
+    parallelism = max(1, int(plan.get("parallelism", 1)))
+    if parallelism > 1 and not plan.get("git", {}).get("use_worktrees", False):
+        print("parallelism requires git.use_worktrees; running sequentially", file=sys.stderr)
+        parallelism = 1
 
     try:
         baseline_id = plan.get("baseline_id")
         baseline_metrics: dict[str, Any] | None = None
 
-        for exp in experiments:
-            result = run_experiment(
+        def run(exp: dict[str, Any], sampling_lock: ContextManager[Any] | None = None) -> dict[str, Any]:
+            return run_experiment(
                 repo_root=repo_root,
                 plan=plan,
+                gates=gates,
                 exp=exp,
                 baseline_metrics=baseline_metrics,
                 dry_run=args.dry_run,
                 run_dir=run_dir,
                 android=args.android,
+                sampling_lock=sampling_lock,
             )
-            append_jsonl(ledger_path, result)
-            summary.append({"id": result["id"], "status": result["status"], "reasons": result["reasons"]})
 
-            if baseline_id and result["id"] == baseline_id and result.get("metrics"):
-                baseline_metrics = result["metrics"]
+        if parallelism == 1:
+            for exp in experiments:
+                result = run(exp)
+                record(result)
+
+                if baseline_id and result["id"] == baseline_id and result.get("metrics"):
+                    baseline_metrics = result["metrics"]
+        else:
+            # The baseline runs alone first so every candidate compares against it.
+            pending = list(experiments)
+            baseline = next((exp for exp in pending if exp["id"] == baseline_id), None)
+            if baseline is not None:
+                pending.remove(baseline)
+                result = run(baseline)
+                record(result)
+                if result.get("metrics"):
+                    baseline_metrics = result["metrics"]
+
+            # logcat capture is device-wide, so Android runs always sample one at a time.
+            serialize = plan.get("serialize_sampling", False) or args.android
+            sampling_lock = threading.Lock() if serialize else None
+            if not serialize:
+                print(
+                    "serialize_sampling is off: experiments' commands and sampling may overlap on the shared daemon",
+                    file=sys.stderr,
+                )
+            with ThreadPoolExecutor(max_workers=parallelism) as pool:
+                futures = {pool.submit(run, exp, sampling_lock): exp for exp in pending}
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        # One broken experiment must not discard the others'
+                        # results; record it as blocked and keep collecting.
+                        exp = futures[future]
+                        result = {
+                            "id": exp["id"],
+                            "status": "blocked",
+                            "started_at": None,
+                            "finished_at": now_iso(),
+                            "worktree": None,
+                            "command_results": [],
+                            "reasons": [f"Experiment raised {type(exc).__name__}: {exc}"],
+                            "metrics": {},
+                            "notes": exp.get("notes", ""),
+                        }
+                    record(result)
+
+            order = {exp["id"]: i for i, exp in enumerate(experiments)}
+            summary.sort(key=lambda row: order[row["id"]])
 
         report = {
-            "started_at": now_iso(),
+            "started_at": run_started.isoformat(timespec="milliseconds"),
             "plan": str(plan_path),
             "run_dir": str(run_dir),
             "dry_run": args.dry_run,
             "daemon": daemon_state,
             "summary": summary,
         }
-        (run_dir / "summary.json").write_text(json.dumps(report, indent=2, ensure_ascii=True) + "\n", encoding="utf-8")
+        (run_dir / "summary.json").write_bytes(dumps_indented(report))
     finally:
+        ledger.close()
         stop_state = stop_daemon(plan, repo_root, proc, dry_run=args.dry_run)
-        (run_dir / "stop.json").write_text(json.dumps(stop_state, indent=2, ensure_ascii=True) + "\n", encoding="utf-8")
+        (run_dir / "stop.json").write_bytes(dumps_indented(stop_state))
 
     passed = [s for s in summary if s["status"] == "passed"]
     failed = [s for s in summary if s["status"] == "failed"]